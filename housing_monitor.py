@@ -4,16 +4,76 @@ Bad Leonfelden Housing Monitor
 Monitors the housing website for updates and sends notifications via ntfy.sh
 """
 
-import requests
+import importlib.util
 import re
-import time
-import json
+import asyncio
+import orjson
 import os
+import signal
+import sys
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple, Union
+
+
+def _lazy_import(name: str):
+    """Import a module on first attribute access rather than at startup"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# Deferred so interactive setup does not pay for loading requests/urllib3
+requests = _lazy_import('requests')
+
+# "Stand: DD.MM.YYYY" on the raw page bytes. Bytes-mode \s is ASCII only, so the
+# UTF-8 no-break spaces (U+00A0, U+202F) are listed next to the &nbsp; entity
+_STAND_MARKER = b'Stand:'
+_STAND_RE = re.compile(rb'Stand:(?:\s|\xc2\xa0|\xe2\x80\xaf|&nbsp;)*(\d{2}\.\d{2}\.\d{4})')
+# Bytes re-scanned before each new chunk so a date split across chunks still matches;
+# covers the marker, the date and a separator of up to about 48 bytes
+_STAND_OVERLAP = 64
+# HTML links in notification messages, quoted either way, for Discord's Markdown
+_LINK_RE = re.compile(r'<a href=["\']([^"\']*)["\']>([^<]*)</a>')
 
 class HousingMonitor:
+    __slots__ = (
+        'url', 'notification_method', 'state_file',
+        'telegram_token', 'telegram_chat_id', 'discord_webhook_url', 'ntfy_topic', 'ntfy_server',
+        'session', 'notify_session', 'etag', 'last_modified', 'content_length', 'last_known_date',
+        '_send', '_stop'
+    )
+
     DEFAULT_NOTIFICATION_TITLE = "Housing Update"
+    NOT_MODIFIED = "NOT_MODIFIED"  # fetch_page sentinel for HTTP 304 responses
+    MAX_PAGE_BYTES = 512_000  # Stop reading a page that never shows a 'Stand:' date
+    STATE_COALESCE_SECONDS = 6 * 60 * 60  # Rewrite the state file for refreshed validators at most this often
+
+    # Credentials per notification method: service label, then
+    # (attribute/kwarg name, environment variable, required, default) entries
+    _CONFIG = {
+        'telegram': ('Telegram', (
+            ('telegram_token', 'TELEGRAM_TOKEN', True, None),
+            ('telegram_chat_id', 'TELEGRAM_CHAT_ID', True, None)
+        )),
+        'discord': ('Discord', (
+            ('discord_webhook_url', 'DISCORD_WEBHOOK_URL', True, None),
+        )),
+        'ntfy': ('ntfy', (
+            ('ntfy_topic', 'NTFY_TOPIC', True, None),
+            ('ntfy_server', 'NTFY_SERVER', False, "https://ntfy.sh")
+        ))
+    }
+
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     
     def __init__(self, notification_method: str = None, **kwargs):
         """
@@ -41,82 +101,181 @@ class HousingMonitor:
 
         # Set up notification method
         self._setup_notification_service(kwargs)
+        self._send = {
+            'telegram': self._send_telegram,
+            'discord': self._send_discord,
+            'ntfy': self._send_ntfy
+        }
+
+        # Reuse pooled connections across checks and notifications
+        self.session = self._build_session()
+        self.session.headers.update({'User-Agent': self.USER_AGENT})
+        self.notify_session = self._build_session()
         
+        # Cache validators from the last full response for conditional requests
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.content_length: Optional[str] = None
+
+        # Set by SIGTERM to end run_continuous without waiting out the interval
+        self._stop: Optional[asyncio.Event] = None
+
         # Load previous state
         self.last_known_date = self.load_state()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _build_session() -> "requests.Session":
+        """Create an HTTP session with a small keep-alive pool and retries"""
+        session = requests.Session()
+        # Exponential backoff for connection/DNS errors, 429 and 5xx, honouring Retry-After
+        retry = requests.adapters.Retry(
+            total=5,
+            backoff_factor=2.0,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'POST']),
+            respect_retry_after_header=True
+        )
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def close(self):
+        """Close the HTTP sessions and release pooled connections"""
+        self.session.close()
+        self.notify_session.close()
     
     def _setup_notification_service(self, kwargs):
         """Set up the notification service based on the selected method"""
-        if self.notification_method == "telegram":
-            self._setup_telegram(kwargs)
-        elif self.notification_method == "discord":
-            self._setup_discord(kwargs)
-        elif self.notification_method == "ntfy":
-            self._setup_ntfy(kwargs)
-    
-    def _setup_telegram(self, kwargs):
-        """Set up Telegram notification service"""
-        self.telegram_token = kwargs.get('telegram_token') or os.getenv('TELEGRAM_TOKEN')
-        self.telegram_chat_id = kwargs.get('telegram_chat_id') or os.getenv('TELEGRAM_CHAT_ID')
-        if not self.telegram_token or not self.telegram_chat_id:
-            raise ValueError("Telegram requires: TELEGRAM_TOKEN and TELEGRAM_CHAT_ID environment variables")
-    
-    def _setup_discord(self, kwargs):
-        """Set up Discord notification service"""
-        self.discord_webhook_url = kwargs.get('discord_webhook_url') or os.getenv('DISCORD_WEBHOOK_URL')
-        if not self.discord_webhook_url:
-            raise ValueError("Discord requires: DISCORD_WEBHOOK_URL environment variable")
-    
-    def _setup_ntfy(self, kwargs):
-        """Set up ntfy notification service"""
-        self.ntfy_topic = kwargs.get('ntfy_topic') or os.getenv('NTFY_TOPIC')
-        self.ntfy_server = kwargs.get('ntfy_server') or os.getenv('NTFY_SERVER', "https://ntfy.sh")
-        if not self.ntfy_topic:
-            raise ValueError("ntfy requires: NTFY_TOPIC environment variable")
-        
+        if self.notification_method not in self._CONFIG:
+            return
+
+        label, fields = self._CONFIG[self.notification_method]
+        missing = False
+        for attr, env, required, default in fields:
+            value = kwargs.get(attr) or os.environ.get(env) or default
+            missing = missing or (required and not value)
+            setattr(self, attr, value)
+
+        if missing:
+            required_envs = [env for _, env, required, _ in fields if required]
+            plural = "s" if len(required_envs) > 1 else ""
+            raise ValueError(f"{label} requires: {' and '.join(required_envs)} environment variable{plural}")
+
     def load_state(self) -> Optional[str]:
-        """Load the last known update date from state file"""
+        """Load the last known update date and cache validators from state file"""
         try:
             if os.path.exists(self.state_file):
-                with open(self.state_file, 'r') as f:
-                    data = json.load(f)
+                with open(self.state_file, 'rb') as f:
+                    data = orjson.loads(f.read())
+                    self.etag = data.get('etag')
+                    self.last_modified = data.get('last_modified')
+                    self.content_length = data.get('content_length')
                     return data.get('last_update_date')
         except Exception as e:
             print(f"Error loading state: {e}")
         return None
     
-    def save_state(self, update_date: str):
-        """Save the current update date to state file"""
+    def save_state(self, update_date: str, validators: tuple):
+        """Atomically save the current update date and cache validators to state file"""
+        etag, last_modified, content_length = validators
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump({
+            # Write a sibling file and swap it in so a crash never leaves a partial state file
+            tmp_file = self.state_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps({
                     'last_update_date': update_date,
-                    'last_check': datetime.now().isoformat()
-                }, f)
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'content_length': content_length,
+                    'last_check': time.time()  # Unix timestamp; informational only
+                }))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.state_file)
+            # Validators only move together with the state file they describe
+            self.etag, self.last_modified, self.content_length = validators
         except Exception as e:
             print(f"Error saving state: {e}")
     
-    def fetch_page(self) -> Optional[str]:
-        """Fetch the housing page content"""
+    def _state_age(self) -> float:
+        """Seconds since the state file was last written"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(self.url, headers=headers, timeout=30)
-            response.raise_for_status()
-            return response.text
+            return time.time() - os.path.getmtime(self.state_file)
+        except OSError:
+            return float('inf')
+
+    def fetch_page(self) -> Union[Tuple[Optional[str], tuple], str, None]:
+        """
+        Fetch the housing page's update date and the validators sent with it,
+        or NOT_MODIFIED if it is unchanged
+        """
+        headers = {}
+        # Only revalidate once we have a known date to fall back on
+        if self.last_known_date is not None:
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+
+        # Cheap HEAD probe for servers that send Last-Modified but ignore conditional GETs
+        if self.last_known_date is not None and self.last_modified and self._head_unchanged():
+            return self.NOT_MODIFIED
+
+        try:
+            with self.session.get(self.url, headers=headers, timeout=30, stream=True) as response:
+                if response.status_code == 304:
+                    return self.NOT_MODIFIED
+                response.raise_for_status()
+                validators = (
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    response.headers.get('Content-Length')
+                )
+                return self._read_until_update_date(response), validators
         except requests.RequestException as e:
             print(f"Error fetching page: {e}")
             return None
     
-    def extract_update_date(self, content: str) -> Optional[str]:
-        """Extract the 'Stand:' date from the page content"""
-        # Look for "Stand: DD.MM.YYYY" pattern, handling HTML entities like &nbsp;
-        pattern = r'Stand:\s*(?:&nbsp;)?(\d{2}\.\d{2}\.\d{4})'
-        match = re.search(pattern, content)
-        
-        if match:
-            return match.group(1)
+    def _head_unchanged(self) -> bool:
+        """Check with a HEAD request whether the saved page's headers still match"""
+        try:
+            probe = self.session.head(self.url, timeout=15, allow_redirects=True)
+        except requests.RequestException as e:
+            print(f"HEAD probe failed, falling back to GET: {e}")
+            return False
+        return (probe.ok and probe.headers.get('Last-Modified') == self.last_modified
+                and probe.headers.get('Content-Length') == self.content_length)
+
+    def _read_until_update_date(self, response: "requests.Response") -> Optional[str]:
+        """Read the response body only as far as the 'Stand:' date and return it"""
+        content = bytearray()
+        for chunk in response.iter_content(4096):
+            start = max(len(content) - _STAND_OVERLAP, 0)
+            content.extend(chunk)
+            update_date = self.extract_update_date(content, start)
+            if update_date:
+                return update_date
+            if len(content) > self.MAX_PAGE_BYTES:
+                break
+        # Only a date padded with more whitespace than the overlap gets this far
+        return self.extract_update_date(content)
+
+    def extract_update_date(self, content: bytes, start: int = 0) -> Optional[str]:
+        """Extract the 'Stand:' date from the raw page content, searching from start"""
+        # Locate the marker with bytes.find and only run the regex from there
+        idx = content.find(_STAND_MARKER, start)
+        while idx != -1:
+            match = _STAND_RE.match(content, idx)
+            if match:
+                return match.group(1).decode('ascii')
+            idx = content.find(_STAND_MARKER, idx + len(_STAND_MARKER))
         return None
     
     def send_telegram_notification(self, message: str):
@@ -129,7 +288,7 @@ class HousingMonitor:
                 'parse_mode': 'HTML',
                 'disable_web_page_preview': False
             }
-            response = requests.post(url, data=data)
+            response = self.notify_session.post(url, data=data, timeout=30)
             response.raise_for_status()
             print("Telegram notification sent successfully")
         except requests.RequestException as e:
@@ -152,36 +311,45 @@ class HousingMonitor:
                 }]
             }
             assert self.discord_webhook_url is not None  # Type checker hint
-            response = requests.post(self.discord_webhook_url, json=data)
+            response = self.notify_session.post(self.discord_webhook_url, json=data, timeout=30)
             response.raise_for_status()
             print("Discord notification sent successfully")
         except requests.RequestException as e:
             print(f"Error sending Discord notification: {e}")
     
+    def _send_telegram(self, message: str, title: str):
+        """Send notification via Telegram (the title is not shown)"""
+        self.send_telegram_notification(message)
+
+    def _send_discord(self, message: str, title: str):
+        """Convert the HTML message to Markdown and send it via Discord"""
+        message = message.replace("<b>", "**").replace("</b>", "**")
+        message = _LINK_RE.sub(r'[\2](\1)', message)
+        self.send_discord_notification(message, title)
+
+    def _send_ntfy(self, message: str, title: str):
+        """Send notification via ntfy"""
+        try:
+            response = self.notify_session.post(
+                f"{self.ntfy_server}/{self.ntfy_topic}",
+                data=message.encode('utf-8'),
+                headers={
+                    "Title": title,
+                    "Priority": "default",
+                    "Tags": "house,announcement"
+                },
+                timeout=30
+            )
+            response.raise_for_status()
+            print("ntfy notification sent successfully")
+        except requests.RequestException as e:
+            print(f"Error sending notification: {e}")
+
     def send_notification(self, message: str, title: str = DEFAULT_NOTIFICATION_TITLE):
         """Send notification via configured method"""
-        if self.notification_method == "discord":
-            # Convert HTML message to Markdown for Discord
-            message = message.replace("<b>", "**").replace("</b>", "**")
-            message = re.sub(r'<a href="([^"]*)">([^<]*)</a>', r'[\2](\1)', message)
-            self.send_discord_notification(message, title)
-        elif self.notification_method == "telegram":
-            self.send_telegram_notification(message)
-        elif self.notification_method == "ntfy":
-            try:
-                response = requests.post(
-                    f"{self.ntfy_server}/{self.ntfy_topic}",
-                    data=message.encode('utf-8'),
-                    headers={
-                        "Title": title,
-                        "Priority": "default",
-                        "Tags": "house,announcement"
-                    }
-                )
-                response.raise_for_status()
-                print("ntfy notification sent successfully")
-            except requests.RequestException as e:
-                print(f"Error sending notification: {e}")
+        send = self._send.get(self.notification_method)
+        if send is not None:
+            send(message, title)
         else:
             # Fallback for other methods
             print(f"Notification ({self.notification_method}): {title} - {message}")
@@ -191,13 +359,16 @@ class HousingMonitor:
         print(f"Checking for updates at {datetime.now()}")
         
         # Fetch page content
-        content = self.fetch_page()
-        if not content:
+        page = self.fetch_page()
+        if page is self.NOT_MODIFIED:
+            print("No updates found (page not modified)")
+            return False
+        if page is None:
             print("Failed to fetch page content")
             return False
         
-        # Extract current update date
-        current_date = self.extract_update_date(content)
+        # The date was extracted while the body streamed in
+        current_date, validators = page
         if not current_date:
             print("Could not find update date on page")
             return False
@@ -208,7 +379,7 @@ class HousingMonitor:
         # Check if there's an update
         if self.last_known_date is None:
             # First run - just save the current date
-            self.save_state(current_date)
+            self.save_state(current_date, validators)
             self.last_known_date = current_date
             print("Initial run - saved current state")
             
@@ -226,12 +397,17 @@ class HousingMonitor:
             self.send_notification(message, "New Housing Listings!")
             
             # Update our stored state
-            self.save_state(current_date)
+            self.save_state(current_date, validators)
             self.last_known_date = current_date
             print("Update detected and notification sent!")
             return True
         
         else:
+            # Persist refreshed validators so the next check can revalidate; a server
+            # sending new ones with every response costs one write per window, not per poll
+            saved = (self.etag, self.last_modified, self.content_length)
+            if saved != validators and self._state_age() >= self.STATE_COALESCE_SECONDS:
+                self.save_state(current_date, validators)
             print("No updates found")
             return False
     
@@ -244,23 +420,41 @@ class HousingMonitor:
         print(f"Monitoring URL: {self.url}")
         print(f"Notification method: {self.notification_method}")
         
-        while True:
+        try:
+            asyncio.run(self._run_loop(check_interval_minutes))
+            print("Monitoring stopped by SIGTERM")
+        except KeyboardInterrupt:
+            print("\nMonitoring stopped by user")
+        finally:
+            self.close()
+
+    async def _run_loop(self, check_interval_minutes: int):
+        """Check on a fixed cadence, running the blocking HTTP work off the event loop"""
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self._stop.set)
+        except NotImplementedError:
+            pass  # No loop signal handlers on Windows; Ctrl+C still works
+
+        while not self._stop.is_set():
+            started = loop.time()
             try:
-                self.check_for_updates()
-                print(f"Sleeping for {check_interval_minutes} minutes...")
-                time.sleep(check_interval_minutes * 60)
-            except KeyboardInterrupt:
-                print("\nMonitoring stopped by user")
-                break
+                await asyncio.to_thread(self.check_for_updates)
             except Exception as e:
+                # Transient HTTP failures are already retried by the sessions
                 print(f"Unexpected error: {e}")
                 print("Continuing monitoring...")
-                time.sleep(60)  # Wait 1 minute before retrying
+            # Time spent fetching and notifying counts towards the interval
+            delay = max(check_interval_minutes * 60 - (loop.time() - started), 0)
+            print(f"Sleeping for {delay / 60:.1f} minutes...")
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
 
 def main():
     """Main function to run the housing monitor"""
-    import sys
-    
     # Check if running in container mode (environment variables set)
     if os.getenv('NOTIFICATION_METHOD'):
         print("=== Bad Leonfelden Housing Monitor (Container Mode) ===")
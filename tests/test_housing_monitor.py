@@ -0,0 +1,140 @@
+import contextlib
+import http.server
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from housing_monitor import HousingMonitor
+
+
+def _page(date: str) -> bytes:
+    return b'<html><body>' + b'x' * 20000 + f'<p>Stand:&nbsp;{date}</p></body></html>'.encode()
+
+
+class _PageHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the server's current page, honouring If-None-Match"""
+
+    def do_GET(self):
+        etag, body, drop = self.server.page
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if drop:
+            # Hang up halfway through the body, before the 'Stand:' date
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+        else:
+            self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CheckForUpdatesTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _PageHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        base_url = f'http://127.0.0.1:{self.server.server_port}'
+
+        with mock.patch.dict(os.environ, {'STATE_FILE': os.path.join(tmp_dir.name, 'state.json')}):
+            self.monitor = HousingMonitor('ntfy', ntfy_topic='housing', ntfy_server=base_url)
+        self.addCleanup(self.monitor.close)
+        self.monitor.url = f'{base_url}/page'
+
+    def check(self) -> bool:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.monitor.check_for_updates()
+
+    def test_dropped_connection_does_not_hide_update(self):
+        self.server.page = ('"v1"', _page('01.01.2025'), False)
+        self.assertTrue(self.check())
+
+        # New page, but the body is cut off before the date arrives
+        self.server.page = ('"v2"', _page('02.02.2025'), True)
+        self.assertFalse(self.check())
+        self.assertEqual(self.monitor.last_known_date, '01.01.2025')
+        self.assertEqual(self.monitor.etag, '"v1"')
+
+        # The retry must not revalidate against the unparsed "v2" body
+        self.server.page = ('"v2"', _page('02.02.2025'), False)
+        self.assertTrue(self.check())
+        self.assertEqual(self.monitor.last_known_date, '02.02.2025')
+        self.assertEqual(self.monitor.etag, '"v2"')
+
+    def test_refreshed_validators_are_coalesced(self):
+        self.server.page = ('"v1"', _page('01.01.2025'), False)
+        self.assertTrue(self.check())
+        state_mtime = os.path.getmtime(self.monitor.state_file)
+
+        # Same date under a new ETag within the window: no rewrite, validators stay put
+        self.server.page = ('"v2"', _page('01.01.2025'), False)
+        self.assertFalse(self.check())
+        self.assertEqual(os.path.getmtime(self.monitor.state_file), state_mtime)
+        self.assertEqual(self.monitor.etag, '"v1"')
+
+        # Once the window has passed the refreshed validators are saved
+        os.utime(self.monitor.state_file, (0, 0))
+        self.assertFalse(self.check())
+        self.assertEqual(self.monitor.etag, '"v2"')
+
+
+class _ChunkedResponse:
+    """Stands in for a streamed response, yielding a body in fixed-size chunks"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+class ExtractUpdateDateTest(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        with mock.patch.dict(os.environ, {'STATE_FILE': os.path.join(tmp_dir.name, 'state.json')}):
+            self.monitor = HousingMonitor('ntfy', ntfy_topic='housing')
+        self.addCleanup(self.monitor.close)
+
+    def test_separators(self):
+        for separator in (' ', '&nbsp;', '\u00a0', '\u202f', ''):
+            with self.subTest(separator=separator):
+                content = f'<p>Stand:{separator}01.01.2025</p>'.encode()
+                self.assertEqual(self.monitor.extract_update_date(content), '01.01.2025')
+
+    def test_no_date(self):
+        self.assertIsNone(self.monitor.extract_update_date(b'<p>Stand: unbekannt</p>'))
+
+    def test_marker_split_across_chunks(self):
+        # Put the chunk boundary inside "Stand:", then inside the date
+        for prefix_length in (4096 - 3, 4096 - 12):
+            with self.subTest(prefix_length=prefix_length):
+                body = b'x' * prefix_length + 'Stand:\u00a002.02.2025'.encode() + b'y' * 8192
+                response = _ChunkedResponse(body)
+                self.assertEqual(self.monitor._read_until_update_date(response), '02.02.2025')
+
+
+if __name__ == '__main__':
+    unittest.main()